@@ -9,7 +9,7 @@ del /q EyeProtector.spec
 del /q EyeProtector.exe
 
 echo Building Single EXE...
-venv\Scripts\pyinstaller --noconfirm --onefile --windowed --name "EyeProtector" --distpath . --hidden-import=PyQt6.QtCore --hidden-import=PyQt6.QtGui --hidden-import=PyQt6.QtWidgets main.py
+venv\Scripts\pyinstaller --noconfirm --onefile --windowed --name "EyeProtector" --distpath . --hidden-import=PyQt6.QtCore --hidden-import=PyQt6.QtGui --hidden-import=PyQt6.QtWidgets --hidden-import=PyQt6.QtNetwork main.py
 
 echo Cleaning up build artifacts...
 rmdir /s /q build
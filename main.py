@@ -1,36 +1,53 @@
 import sys
 import os
+from functools import partial
 from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
 from PyQt6.QtGui import QIcon, QAction
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QTimer, QEvent
 
 # Ensure src is in path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 
 from src.core.config import config_manager
+from src.core.memory import rss_mb, trim_allocator
+from src.core.clock import system_clock
 
 from src.core.timer_service import TimerService
-from src.ui.overlay import OverlayWindow
+from src.ui.overlay import OverlayWindow, clear_render_cache
 from src.ui.settings import SettingsDialog
 
 class EyeProtectionApp:
-    def __init__(self):
-        self.app = QApplication(sys.argv)
+    def __init__(self, clock=None, show_settings_on_launch=True):
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.app.setQuitOnLastWindowClosed(False)
         
         # Load Config
         self.config = config_manager
+        self.clock = clock or system_clock
+        self.show_settings_on_launch = show_settings_on_launch
         
         # Service
-        self.timer_service = TimerService()
+        self.timer_service = TimerService(clock)
         self.timer_service.work_finished.connect(self.show_overlay)
         self.timer_service.rest_finished.connect(self.timer_service.start_work) # Loop back
         
-        # Windows
-        self.overlays = []
+        # Windows, one overlay per screen during a break
+        self.overlays = {}
         self.settings_dialog = None
 
+        # Break paused because its last screen went away (e.g. undocking with the lid closed)
+        self.suspended_time_left = None
+        self.suspend_timer = QTimer()
+        self.suspend_timer.setSingleShot(True)
+        self.suspend_timer.timeout.connect(self.finish_break)
+
+        # Follow screens being plugged/unplugged or rescaled
+        self.app.screenAdded.connect(self.on_screen_added)
+        self.app.screenRemoved.connect(self.on_screen_removed)
+        for screen in self.app.screens():
+            self.watch_screen(screen)
+
         # Setup System Tray
         self.setup_tray()
         
@@ -70,7 +87,8 @@ class EyeProtectionApp:
         self.tray_icon.setContextMenu(self.menu)
 
         # Show settings on launch for better visibility
-        self.show_settings()
+        if self.show_settings_on_launch:
+            self.show_settings()
 
     def show_settings(self):
         if not self.settings_dialog:
@@ -85,27 +103,81 @@ class EyeProtectionApp:
             # For simplicity, we just let the next cycle pick it up, 
             # or we could restart the timer service if the user wants immediate effect.
             # Let's restart the work timer to apply new interval immediately if in work mode.
-            if not self.overlays: # In work mode
+            if not self.in_break(): # In work mode
                 self.timer_service.start_work()
 
+        if not self.in_break():
+            QTimer.singleShot(0, partial(self.enter_idle_mode, rss_mb()))
+
     def show_overlay(self):
         print("Showing overlay...")
         # Clear existing overlays
         self.close_overlays()
         
         # Create an overlay for each screen
-        screens = self.app.screens()
-        for screen in screens:
-            overlay = OverlayWindow(screen.geometry())
-            overlay.finished.connect(self.on_overlay_finished)
-            overlay.show()
-            self.overlays.append(overlay)
+        for screen in self.app.screens():
+            self.create_overlay(screen)
+
+    def create_overlay(self, screen, time_left=None):
+        overlay = OverlayWindow(screen.geometry(), screen.devicePixelRatio(), time_left, self.clock)
+        overlay.finished.connect(self.on_overlay_finished)
+        overlay.show()
+        self.overlays[screen] = overlay
+
+    def remove_overlay(self, screen):
+        overlay = self.overlays.pop(screen, None)
+        if overlay:
+            overlay.finished.disconnect(self.on_overlay_finished)
+            overlay.release_resources()
+            overlay.close()
+            overlay.deleteLater()
 
     def close_overlays(self):
-        for overlay in self.overlays:
+        for overlay in self.overlays.values():
+            overlay.release_resources()
             overlay.close()
             overlay.finished.disconnect(self.on_overlay_finished) # Disconnect to prevent double signals
+            overlay.deleteLater()
         self.overlays.clear()
+        self.suspend_timer.stop()
+        self.suspended_time_left = None
+        clear_render_cache()
+
+    def in_break(self):
+        return bool(self.overlays) or self.suspended_time_left is not None
+
+    def watch_screen(self, screen):
+        screen.geometryChanged.connect(partial(self.on_screen_changed, screen))
+        screen.logicalDotsPerInchChanged.connect(partial(self.on_screen_changed, screen))
+
+    def on_screen_added(self, screen):
+        self.watch_screen(screen)
+        if self.suspended_time_left is not None:
+            # Resume the break that lost its last screen
+            time_left = self.suspended_time_left
+            self.suspend_timer.stop()
+            self.suspended_time_left = None
+            self.create_overlay(screen, time_left)
+        elif self.overlays:
+            # Join the break already in progress
+            time_left = next(iter(self.overlays.values())).time_left
+            self.create_overlay(screen, time_left)
+
+    def on_screen_removed(self, screen):
+        if screen not in self.overlays:
+            return
+        if len(self.overlays) == 1:
+            # The only covered screen went away, often just before another one is added.
+            # Keep the remaining rest and resume it on the next screen; if none comes
+            # back before the rest would have ended, finish the break then.
+            self.suspended_time_left = self.overlays[screen].time_left
+            self.suspend_timer.start(self.clock.interval_ms(self.suspended_time_left * 1000))
+        self.remove_overlay(screen)
+
+    def on_screen_changed(self, screen, *args):
+        overlay = self.overlays.get(screen)
+        if overlay:
+            overlay.update_screen(screen.geometry(), screen.devicePixelRatio())
 
     def on_overlay_finished(self):
         # When one overlay finishes (e.g. user pressed ESC or time up), 
@@ -113,10 +185,43 @@ class EyeProtectionApp:
         # Check if we are already closing to avoid recursion
         if not self.overlays:
             return
-            
+        self.finish_break()
+
+    def finish_break(self):
         print("Rest over.")
+        # Sample while the break's overlays are still alive
+        before = rss_mb()
         self.close_overlays()
         self.timer_service.on_rest_finished()
+        # Leave the finished signal's call stack before deleting the overlays
+        QTimer.singleShot(0, partial(self.enter_idle_mode, before))
+
+    def enter_idle_mode(self, before=None):
+        # Only wait for the work timer between breaks: free everything render related
+        if self.in_break():
+            return
+
+        if before is None:
+            before = rss_mb()
+
+        if self.settings_dialog and not self.settings_dialog.isVisible():
+            # Deleting the dialog frees its thumbnail icons with it
+            self.settings_dialog.deleteLater()
+            self.settings_dialog = None
+
+        clear_render_cache()
+        # Run the pending deleteLater() of overlays and dialog now instead of "eventually"
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        trim_allocator()
+
+        after = rss_mb()
+        if before is None or after is None:
+            return
+        print(f"Idle mode: RSS {before:.1f} MB -> {after:.1f} MB")
+
+        budget = config_manager.get("idle_rss_budget_mb", 120)
+        if budget and after > budget:
+            print(f"Warning: idle RSS {after:.1f} MB exceeds budget of {budget} MB")
 
     def exit_app(self):
         self.timer_service.stop()
@@ -127,5 +232,10 @@ class EyeProtectionApp:
         sys.exit(self.app.exec())
 
 if __name__ == "__main__":
+    if "--render-service" in sys.argv:
+        # Shared render service for terminal servers, see src/core/render_service.py
+        from src.core.render_service import main as render_service_main
+        sys.exit(render_service_main())
+
     app = EyeProtectionApp()
     app.run()
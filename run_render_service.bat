@@ -0,0 +1,9 @@
+@echo off
+cd /d "%~dp0"
+if not exist venv (
+    echo Virtual environment not found. Please create it first.
+    pause
+    exit /b
+)
+start "" "venv\Scripts\pythonw.exe" main.py --render-service
+echo Render service started in background. Set "render_service": true in config.json to use it.
@@ -0,0 +1,231 @@
+"""Headless soak run of the work -> rest -> work loop.
+
+Runs thousands of compressed cycles on the offscreen platform and checks that
+live QObjects, widgets, active timers, Python objects and RSS do not grow.
+
+QObjects are counted two ways: objects with a live Python wrapper (from
+gc.get_objects()) and the C++ object trees under QApplication and every
+top-level widget. A parentless C++ QObject that never got a Python wrapper
+is invisible to both.
+
+The run uses an in-memory config, never config.json: a few generated
+wallpapers in cycle mode, so every break decodes, blurs and cycles real
+images. --render-service additionally routes renders through an
+in-process RenderServer and the shared-mapping client path; each sample
+then waits until the service has answered the overlays that just closed.
+
+Growth is judged on the trend: the median of the first --window samples
+after warm-up against the median of the last --window samples, so a
+small per-cycle leak adds up instead of hiding in a fixed slack.
+
+    python soak.py --cycles 2000
+    python soak.py --cycles 2000 --render-service
+"""
+import argparse
+import contextlib
+import gc
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+from PIL import Image
+
+from main import EyeProtectionApp
+from src.core.clock import AcceleratedClock
+from src.core.config import config_manager
+from src.core.memory import rss_mb
+
+WALLPAPER_COLORS = [(200, 60, 40), (40, 120, 200), (60, 160, 80)]
+
+def soak_config(workdir, render_service):
+    """In-memory config exercising image decoding, cycle mode and optionally the render service."""
+    wallpapers = []
+    for i, color in enumerate(WALLPAPER_COLORS):
+        path = os.path.join(workdir, f"wallpaper{i}.png")
+        Image.new("RGB", (640, 400), color=color).save(path)
+        wallpapers.append(path)
+    return dict(config_manager.config,
+                wallpapers=wallpapers,
+                wallpaper_mode="cycle",
+                cycle_interval_seconds=2,
+                rest_duration_seconds=6,
+                render_service=render_service,
+                render_service_roots=[workdir],
+                render_service_dir=os.path.join(workdir, "cache"))
+
+def sample():
+    gc.collect()
+    objects = gc.get_objects()
+    qobjects = [o for o in objects if isinstance(o, QObject) and not sip.isdeleted(o)]
+    app = QApplication.instance()
+    stats = {
+        "qobjects": len(qobjects),
+        "qt_tree": len(app.findChildren(QObject)) + sum(1 + len(w.findChildren(QObject)) for w in app.topLevelWidgets()),
+        "widgets": len(QApplication.allWidgets()),
+        "timers": sum(1 for o in qobjects if isinstance(o, QTimer) and o.isActive()),
+        "py_objects": len(objects),
+        "rss_mb": rss_mb() or 0.0,
+    }
+    del objects, qobjects
+    return stats
+
+def format_stats(stats):
+    return (f"qobjects={stats['qobjects']} qt_tree={stats['qt_tree']} widgets={stats['widgets']} timers={stats['timers']} "
+            f"py_objects={stats['py_objects']} rss={stats['rss_mb']:.1f}MB")
+
+class SoakApp(EyeProtectionApp):
+    def __init__(self, args, report, server=None):
+        self.args = args
+        self.report = report
+        self.server = server
+        self.cycles = 0
+        self.samples = []
+        self.final = None
+        self.failure = None
+        self.last_sample_time = time.monotonic()
+        super().__init__(clock=AcceleratedClock(args.speed), show_settings_on_launch=False)
+
+        # Real-time watchdog in case the loop stalls
+        self.watchdog = QTimer()
+        self.watchdog.timeout.connect(self.check_stalled)
+        self.watchdog.start(1000)
+
+    def enter_idle_mode(self, before=None):
+        super().enter_idle_mode(before)
+        if self.overlays:
+            return
+        self.cycles += 1
+        self.sample_when_settled(self.cycles)
+
+    def sample_when_settled(self, cycle):
+        if cycle != self.cycles or self.in_break():
+            # The next break started first, this cycle goes unsampled
+            return
+        if not self.service_quiet():
+            QTimer.singleShot(0, partial(self.sample_when_settled, cycle))
+            return
+        self.on_cycle()
+
+    def service_quiet(self):
+        # Replies for the overlays that just closed may still be in flight
+        if self.server is None:
+            return True
+        from src.core.render_service import render_client
+        return not (render_client.requests or self.server.clients or self.server.pending)
+
+    def on_cycle(self):
+        self.last_sample_time = time.monotonic()
+        stats = sample()
+
+        if self.cycles <= self.args.warmup:
+            return
+        self.samples.append(stats)
+        if len(self.samples) == 1:
+            print(f"baseline after {self.cycles - 1} cycles: {format_stats(stats)}", file=self.report)
+        elif self.cycles % self.args.report_every == 0:
+            print(f"cycle {self.cycles}: {format_stats(stats)}", file=self.report)
+
+        if len(self.samples) >= self.args.cycles:
+            self.final = stats
+            self.app.quit()
+
+    def check_stalled(self):
+        if time.monotonic() - self.last_sample_time > self.args.stall_seconds:
+            self.failure = f"no cycle sampled in {self.args.stall_seconds}s (stuck after {self.cycles} cycles)"
+            self.app.quit()
+
+    def leaks(self):
+        slack = {
+            "qobjects": 0,
+            "qt_tree": 0,
+            "widgets": 0,
+            "timers": 0,
+            "py_objects": self.args.py_slack,
+            "rss_mb": self.args.rss_slack_mb,
+        }
+        window = min(self.args.window, len(self.samples) // 2)
+        if window == 0:
+            return ["not enough cycles after warm-up to compare"]
+        first, last = self.samples[:window], self.samples[-window:]
+        leaks = []
+        for key, allowed in slack.items():
+            start = statistics.median(s[key] for s in first)
+            end = statistics.median(s[key] for s in last)
+            if end - start > allowed:
+                leaks.append(f"{key} grew from median {start} to {end} over {len(self.samples)} samples")
+        return leaks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak the work/rest loop headlessly.")
+    parser.add_argument("--cycles", type=int, default=2000, help="sampled cycles after warm-up")
+    parser.add_argument("--warmup", type=int, default=20, help="cycles before the baseline sample")
+    parser.add_argument("--speed", type=float, default=100000, help="clock acceleration factor")
+    parser.add_argument("--report-every", type=int, default=100)
+    parser.add_argument("--window", type=int, default=100, help="samples per end when comparing the trend")
+    # Small slacks absorb interpreter/allocator noise only: with the defaults a leak of
+    # 0.03 objects per cycle over 2000 cycles already fails
+    parser.add_argument("--py-slack", type=int, default=50, help="allowed median Python object growth")
+    parser.add_argument("--rss-slack-mb", type=float, default=2.0, help="allowed median RSS growth")
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument("--render-service", action="store_true",
+                        help="render through an in-process render service instead of in the overlays")
+    args = parser.parse_args(argv)
+
+    report = sys.stdout
+    workdir = tempfile.mkdtemp(prefix="eyeprotector-soak-")
+    saved_config = config_manager.config
+    config_manager.config = soak_config(workdir, args.render_service)
+    print(f"soaking with {len(WALLPAPER_COLORS)} wallpapers in cycle mode, "
+          f"render service {'on' if args.render_service else 'off'}", file=report)
+
+    server = None
+    try:
+        # The app logs every cycle, keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            # The service's sockets need the application's event dispatcher
+            app = QApplication.instance() or QApplication(sys.argv)
+            if args.render_service:
+                from src.core.render_service import RenderServer, render_client
+                server = RenderServer(f"EyeProtectorRenderSoak-{os.getpid()}")
+                if not server.listen():
+                    print("FAIL: could not start the render service", file=report)
+                    return 1
+                saved_server_name = render_client.server_name
+                render_client.server_name = server.server_name
+
+            soak = SoakApp(args, report, server)
+            soak.app.exec()
+            soak.watchdog.stop()
+            soak.timer_service.stop()
+            soak.close_overlays()
+    finally:
+        if server:
+            server.shutdown()
+            render_client.server_name = saved_server_name
+        config_manager.config = saved_config
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if soak.failure:
+        print(f"FAIL: {soak.failure}", file=report)
+        return 1
+
+    print(f"final after {soak.cycles} cycles ({len(soak.samples)} compared): {format_stats(soak.final)}", file=report)
+    leaks = soak.leaks()
+    for leak in leaks:
+        print(f"FAIL: {leak}", file=report)
+    if leaks:
+        return 1
+    print("OK: no growth detected", file=report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import time
+
+class Clock:
+    """Wall clock used by timers and overlays. Replace it to compress time, e.g. in soak runs."""
+    speed = 1
+
+    def time(self):
+        return time.time()
+
+    def interval_ms(self, ms):
+        # Real QTimer interval for a nominal interval of `ms` milliseconds
+        return max(1, round(ms / self.speed))
+
+class AcceleratedClock(Clock):
+    """Clock running `speed` times faster than real time."""
+
+    def __init__(self, speed):
+        self.speed = speed
+        self.origin = time.time()
+        self.monotonic_origin = time.monotonic()
+
+    def time(self):
+        return self.origin + (time.monotonic() - self.monotonic_origin) * self.speed
+
+# Global instance
+system_clock = Clock()
@@ -9,7 +9,15 @@ class ConfigManager:
             "work_interval_minutes": 45,
             "rest_duration_seconds": 20,
             "image_folder": "assets/wallpapers",
-            "blur_radius": 15
+            "blur_radius": 15,
+            "idle_rss_budget_mb": 120,
+            "render_service": False,
+            "render_service_roots": [],
+            "render_service_dir": "",
+            "render_service_max_bytes": 512 * 1024 * 1024,
+            "render_service_max_pending": 4,
+            "render_service_workers": 2,
+            "render_service_timeout_ms": 10000
         }
         self.config = self.load_config()
 
@@ -0,0 +1,68 @@
+import ctypes
+import gc
+import os
+import sys
+
+# Process memory usage and allocator trimming without extra dependencies.
+# Windows is the main target, Linux is supported for servers and CI.
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS_EX(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+            ("PrivateUsage", ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.WinDLL("kernel32")
+    psapi = ctypes.WinDLL("psapi")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    kernel32.GetProcessHeap.restype = wintypes.HANDLE
+    kernel32.HeapCompact.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    kernel32.HeapCompact.restype = ctypes.c_size_t
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS_EX), wintypes.DWORD]
+    psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+
+def rss_bytes():
+    """Return the memory the process keeps for itself in bytes, or None if unknown.
+
+    Windows reports private commit (PrivateUsage), which is not lowered by
+    paging the working set out. Linux reports resident set size.
+    """
+    try:
+        if sys.platform == "win32":
+            counters = PROCESS_MEMORY_COUNTERS_EX()
+            counters.cb = ctypes.sizeof(counters)
+            if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.PrivateUsage
+            return None
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+def rss_mb():
+    rss = rss_bytes()
+    return rss / (1024 * 1024) if rss is not None else None
+
+def trim_allocator():
+    """Collect garbage and hand freed heap pages back to the OS."""
+    gc.collect()
+    try:
+        if sys.platform == "win32":
+            kernel32.HeapCompact(kernel32.GetProcessHeap(), 0)
+            ctypes.CDLL("ucrtbase")._heapmin()
+        elif sys.platform.startswith("linux"):
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except Exception as e:
+        print(f"Error trimming allocator: {e}")
@@ -0,0 +1,46 @@
+import mmap
+from PyQt6.QtGui import QImage
+from PyQt6 import sip
+from PIL import Image, ImageFilter
+
+# Background rendering shared by the overlays and the render service.
+# Kept free of QtNetwork so desktops without the service do not load it.
+
+PLACEHOLDER_COLOR = (73, 109, 137)
+
+def render_rgb(path, width, height, blur_radius):
+    """Decode, resize and blur `path` (None = placeholder) into packed RGB888 bytes."""
+    if path is None:
+        img = Image.new('RGB', (width, height), color = PLACEHOLDER_COLOR)
+    else:
+        with Image.open(path) as src:
+            # Simple resize to screen size to save blur performance
+            img = src.convert('RGB').resize((width, height))
+
+    if blur_radius > 0:
+        blurred = img.filter(ImageFilter.GaussianBlur(blur_radius))
+        img.close()
+        img = blurred
+
+    data = img.tobytes("raw", "RGB")
+    # Free the Pillow buffers now rather than at GC
+    img.close()
+    return data
+
+class MappedRender:
+    """Read-only mapping of a render file; `image` wraps the mapped pixels without copying.
+
+    Keep this object alive for as long as `image` is painted.
+    """
+
+    def __init__(self, file_path, width, height):
+        with open(file_path, "rb") as f:
+            # Copy-on-write: pages stay shared, a stray write could not reach the file
+            self.pixels = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        if len(self.pixels) != width * height * 3:
+            self.pixels.close()
+            raise ValueError(f"{file_path} is not a {width}x{height} render")
+        self.image = QImage(sip.voidptr(self.pixels), width, height, width * 3, QImage.Format.Format_RGB888)
+
+    def size(self):
+        return self.image.size()
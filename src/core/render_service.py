@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from PyQt6.QtCore import QObject, QCoreApplication, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from PyQt6 import sip
+from src.core.config import config_manager
+from src.core.render import MappedRender, render_rgb
+from src.core.secure_dir import make_private_dir
+
+# Optional render service shared by every session on a terminal server.
+# Clients ask over a QLocalServer socket for (image, size, radius); the service
+# renders each combination once into a file in a shared directory and every
+# client paints straight from a read-only mapping of that file, so the pixels
+# live once in the page cache instead of once per session.
+
+SERVER_NAME = "EyeProtectorRender"
+CONNECT_TIMEOUT_MS = 200
+MAX_REQUEST_BYTES = 4096
+# 8K, the largest monitors in use; bounds one render to about 100 MB of RGB
+MAX_RENDER_SIDE = 7680
+MAX_BLUR_RADIUS = 500
+
+def render_file(cache_dir, key, path, width, height, blur_radius):
+    """Render into `cache_dir`/`key`.rgb and return its path. Runs on a worker thread."""
+    data = render_rgb(path, width, height, blur_radius)
+    # mkstemp opens with O_EXCL, a planted file or symlink cannot redirect the write
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        file_path = os.path.join(cache_dir, key + ".rgb")
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return file_path
+
+def default_cache_dir():
+    if os.path.isdir("/dev/shm"):
+        base = "/dev/shm"
+    else:
+        base = os.environ.get("ProgramData") or tempfile.gettempdir()
+    return os.path.join(base, "EyeProtectorRender")
+
+class RenderServer(QObject):
+    rendered = pyqtSignal(str, int, object) # key, reserved bytes, reply; emitted from worker threads
+
+    def __init__(self, server_name=SERVER_NAME):
+        super().__init__()
+        self.server_name = server_name
+        self.cache_dir = config_manager.get("render_service_dir", "") or default_cache_dir()
+        # The cache usually lives in /dev/shm (RAM) and any local user can send requests,
+        # so both the stored renders and the renders in progress are bounded
+        self.max_bytes = config_manager.get("render_service_max_bytes", 512 * 1024 * 1024)
+        self.max_pending = config_manager.get("render_service_max_pending", 4)
+        self.cache_bytes = 0
+        self.pending_bytes = 0
+        # Only images under these folders are rendered, clients cannot make the service read arbitrary files
+        self.roots = [os.path.realpath(root) for root in config_manager.get("render_service_roots", [])]
+        self.entries = OrderedDict() # key -> (rendered file path, size in bytes)
+        self.pending = {} # key -> sockets waiting for a render in progress
+        # Connected clients; without this reference the garbage collector can drop a socket's wrapper and slots mid-request
+        self.clients = set()
+
+        # Renders run off the event loop so one slow wallpaper does not stall every session
+        self.executor = ThreadPoolExecutor(max_workers=config_manager.get("render_service_workers", 2))
+        self.rendered.connect(self.on_rendered)
+
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.WorldAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self):
+        try:
+            self.prepare_cache_dir()
+        except Exception as e:
+            print(f"Error preparing render cache {self.cache_dir}: {e}")
+            return False
+
+        if self.server.listen(self.server_name):
+            return True
+
+        # A leftover socket from a crashed service blocks listen() on Unix
+        probe = QLocalSocket()
+        probe.connectToServer(self.server_name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            print(f"Render service already running as {self.server_name}")
+            return False
+        QLocalServer.removeServer(self.server_name)
+        if not self.server.listen(self.server_name):
+            print(f"Error starting render service: {self.server.errorString()}")
+            return False
+        return True
+
+    def shutdown(self):
+        self.server.close()
+        self.executor.shutdown(wait=True)
+
+    def prepare_cache_dir(self):
+        # The default locations are writable by every user, make sure nobody else planted the directory
+        make_private_dir(self.cache_dir)
+
+        # Renders from a previous run are not tracked anymore
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".rgb", ".tmp")):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError as e:
+                    print(f"Error removing stale render {name}: {e}")
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.setReadBufferSize(MAX_REQUEST_BYTES)
+            self.clients.add(socket)
+            socket.readyRead.connect(partial(self.on_ready_read, socket))
+            socket.disconnected.connect(partial(self.on_disconnected, socket))
+
+    def on_disconnected(self, socket):
+        self.clients.discard(socket)
+        socket.deleteLater()
+
+    def on_ready_read(self, socket):
+        while socket.canReadLine():
+            self.handle_request(socket, bytes(socket.readLine()))
+        if socket.bytesAvailable() >= MAX_REQUEST_BYTES:
+            # A full buffer without a newline, drop the client instead of growing
+            socket.abort()
+
+    def is_allowed(self, path):
+        for root in self.roots:
+            try:
+                if os.path.commonpath([root, path]) == root:
+                    return True
+            except ValueError:
+                # Different drives on Windows
+                continue
+        return False
+
+    def parse_request(self, line):
+        request = json.loads(line.decode("utf-8"))
+        path = os.path.realpath(request["path"])
+        width = int(request["width"])
+        height = int(request["height"])
+        blur_radius = float(request["blur_radius"])
+
+        if not (0 < width <= MAX_RENDER_SIDE and 0 < height <= MAX_RENDER_SIDE):
+            raise ValueError(f"bad size {width}x{height}")
+        if not 0 <= blur_radius <= MAX_BLUR_RADIUS:
+            raise ValueError(f"bad blur radius {blur_radius}")
+        if not self.is_allowed(path):
+            raise ValueError(f"not under an allowed folder: {path}")
+
+        mtime = os.path.getmtime(path)
+        key = hashlib.sha1(json.dumps([path, mtime, width, height, blur_radius]).encode("utf-8")).hexdigest()
+        return key, path, width, height, blur_radius
+
+    def handle_request(self, socket, line):
+        try:
+            key, path, width, height, blur_radius = self.parse_request(line)
+        except Exception as e:
+            self.reply(socket, {"error": f"Bad request: {e}"})
+            return
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.reply(socket, {"file": entry[0], "width": width, "height": height})
+            return
+
+        # Sessions asking for the same render while it is in progress share it
+        waiting = self.pending.get(key)
+        if waiting is not None:
+            waiting.append(socket)
+            return
+
+        size = width * height * 3
+        if len(self.pending) >= self.max_pending:
+            self.reply(socket, {"error": "Busy: too many renders in progress"})
+            return
+        if not self.make_room(size):
+            self.reply(socket, {"error": f"Render of {size} bytes does not fit the cache budget"})
+            return
+        self.pending[key] = [socket]
+        self.pending_bytes += size
+
+        future = self.executor.submit(render_file, self.cache_dir, key, path, width, height, blur_radius)
+        future.add_done_callback(partial(self.on_future_done, key, size, path, width, height))
+
+    def make_room(self, size):
+        """Evict the oldest renders until `size` more bytes fit in the budget."""
+        while self.entries and self.cache_bytes + self.pending_bytes + size > self.max_bytes:
+            _, (old_path, old_size) = self.entries.popitem(last=False)
+            self.cache_bytes -= old_size
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                # Still mapped by a client on Windows, it is cleaned up on next start
+                print(f"Error removing render {old_path}: {e}")
+        return self.cache_bytes + self.pending_bytes + size <= self.max_bytes
+
+    def on_future_done(self, key, size, path, width, height, future):
+        # Worker thread: hand the result back to the event loop
+        try:
+            reply = {"file": future.result(), "width": width, "height": height}
+            print(f"Rendered {path} at {width}x{height}")
+        except Exception as e:
+            print(f"Error rendering {path}: {e}")
+            reply = {"error": str(e)}
+        self.rendered.emit(key, size, reply)
+
+    def on_rendered(self, key, size, reply):
+        # The bytes were reserved in make_room(), they move from pending to the cache
+        self.pending_bytes -= size
+        if "file" in reply:
+            self.entries[key] = (reply["file"], size)
+            self.cache_bytes += size
+
+        for socket in self.pending.pop(key, []):
+            self.reply(socket, reply)
+
+    def reply(self, socket, reply):
+        if sip.isdeleted(socket) or socket.state() != QLocalSocket.LocalSocketState.ConnectedState:
+            return
+        socket.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+class RenderRequest(QObject):
+    """One asynchronous request to the render service."""
+    done = pyqtSignal(object) # MappedRender, or None to render in-process
+
+    def __init__(self, server_name, path, width, height, blur_radius, timeout_ms):
+        super().__init__()
+        self.server_name = server_name
+        self.request = {"path": path, "width": width, "height": height, "blur_radius": blur_radius}
+        self.finished = False
+
+        self.socket = QLocalSocket(self)
+        self.socket.connected.connect(self.on_connected)
+        self.socket.readyRead.connect(self.on_ready_read)
+        self.socket.errorOccurred.connect(self.on_error)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(timeout_ms)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def start(self):
+        self.timer.start()
+        self.socket.connectToServer(self.server_name)
+
+    def on_connected(self):
+        self.socket.write((json.dumps(self.request) + "\n").encode("utf-8"))
+
+    def on_ready_read(self):
+        if self.socket.canReadLine():
+            self.finish(self.read_reply(bytes(self.socket.readLine())))
+        elif self.socket.bytesAvailable() > MAX_REQUEST_BYTES:
+            self.finish(None)
+
+    def read_reply(self, line):
+        path = self.request["path"]
+        try:
+            reply = json.loads(line.decode("utf-8"))
+            if "error" in reply:
+                print(f"Render service refused {path}: {reply['error']}")
+                return None
+            return MappedRender(reply["file"], self.request["width"], self.request["height"])
+        except Exception as e:
+            print(f"Error mapping render of {path}: {e}")
+            return None
+
+    def on_error(self, error):
+        if error != QLocalSocket.LocalSocketError.ServerNotFoundError and not self.finished:
+            print(f"Render service error: {self.socket.errorString()}")
+        self.finish(None)
+
+    def on_timeout(self):
+        print(f"Render service timed out for {self.request['path']}")
+        self.finish(None)
+
+    def finish(self, result):
+        if self.finished:
+            return
+        self.finished = True
+        self.timer.stop()
+        self.socket.abort()
+        self.done.emit(result)
+        self.deleteLater()
+
+class RenderClient:
+    def __init__(self, server_name=SERVER_NAME):
+        self.server_name = server_name
+        self.requests = {} # request key -> RenderRequest in flight
+        self.callbacks = {} # request key -> callbacks waiting for it
+
+    def request(self, path, width, height, blur_radius, callback):
+        """Ask the service for a render without blocking.
+
+        `callback` later receives a MappedRender, or None when the service is
+        missing or failed and the caller should render in-process.
+        """
+        key = (path, width, height, blur_radius)
+        if key in self.callbacks:
+            self.callbacks[key].append(callback)
+            return
+        self.callbacks[key] = [callback]
+
+        timeout = config_manager.get("render_service_timeout_ms", 10000)
+        request = RenderRequest(self.server_name, path, width, height, blur_radius, timeout)
+        request.done.connect(partial(self.on_done, key))
+        self.requests[key] = request
+        request.start()
+
+    def on_done(self, key, result):
+        self.requests.pop(key, None)
+        for callback in self.callbacks.pop(key, []):
+            callback(result)
+
+# Global instance
+render_client = RenderClient()
+
+def main():
+    app = QCoreApplication(sys.argv)
+    server = RenderServer()
+    if not server.listen():
+        return 1
+    if not server.roots:
+        print("Warning: render_service_roots is empty, every request will be refused")
+    print(f"Render service listening on {server.server_name}, cache in {server.cache_dir}")
+    result = app.exec()
+    server.shutdown()
+    return result
@@ -0,0 +1,163 @@
+import ctypes
+import os
+import stat
+import sys
+
+# A directory that only the current account can write and every user can read,
+# used for render files shared between sessions.
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    TOKEN_QUERY = 0x0008
+    TOKEN_USER_CLASS = 1
+    SDDL_REVISION_1 = 1
+    SE_FILE_OBJECT = 1
+    OWNER_SECURITY_INFORMATION = 0x1
+    DACL_SECURITY_INFORMATION = 0x4
+    PROTECTED_DACL_SECURITY_INFORMATION = 0x80000000
+    ERROR_ALREADY_EXISTS = 183
+
+    # Owners that may hold the directory: ourselves, SYSTEM, Administrators
+    TRUSTED_OWNERS = ("S-1-5-18", "S-1-5-32-544")
+
+    class SECURITY_ATTRIBUTES(ctypes.Structure):
+        _fields_ = [
+            ("nLength", wintypes.DWORD),
+            ("lpSecurityDescriptor", ctypes.c_void_p),
+            ("bInheritHandle", wintypes.BOOL),
+        ]
+
+    class SID_AND_ATTRIBUTES(ctypes.Structure):
+        _fields_ = [
+            ("Sid", ctypes.c_void_p),
+            ("Attributes", wintypes.DWORD),
+        ]
+
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    kernel32.LocalFree.argtypes = [ctypes.c_void_p]
+    kernel32.LocalFree.restype = ctypes.c_void_p
+    kernel32.CreateDirectoryW.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(SECURITY_ATTRIBUTES)]
+    kernel32.CreateDirectoryW.restype = wintypes.BOOL
+    advapi32.OpenProcessToken.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE)]
+    advapi32.OpenProcessToken.restype = wintypes.BOOL
+    advapi32.GetTokenInformation.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p,
+                                             wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)]
+    advapi32.GetTokenInformation.restype = wintypes.BOOL
+    advapi32.ConvertSidToStringSidW.argtypes = [ctypes.c_void_p, ctypes.POINTER(wintypes.LPWSTR)]
+    advapi32.ConvertSidToStringSidW.restype = wintypes.BOOL
+    advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(wintypes.ULONG)]
+    advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW.restype = wintypes.BOOL
+    advapi32.GetSecurityDescriptorDacl.argtypes = [ctypes.c_void_p, ctypes.POINTER(wintypes.BOOL),
+                                                   ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(wintypes.BOOL)]
+    advapi32.GetSecurityDescriptorDacl.restype = wintypes.BOOL
+    advapi32.GetNamedSecurityInfoW.argtypes = [
+        wintypes.LPCWSTR, ctypes.c_int, wintypes.DWORD, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_void_p),
+        ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_void_p)]
+    advapi32.GetNamedSecurityInfoW.restype = wintypes.DWORD
+    advapi32.SetNamedSecurityInfoW.argtypes = [
+        wintypes.LPWSTR, ctypes.c_int, wintypes.DWORD, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+    advapi32.SetNamedSecurityInfoW.restype = wintypes.DWORD
+
+    def sid_to_string(sid):
+        text = wintypes.LPWSTR()
+        if not advapi32.ConvertSidToStringSidW(sid, ctypes.byref(text)):
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            return text.value
+        finally:
+            kernel32.LocalFree(text)
+
+    def current_user_sid():
+        token = wintypes.HANDLE()
+        if not advapi32.OpenProcessToken(kernel32.GetCurrentProcess(), TOKEN_QUERY, ctypes.byref(token)):
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            size = wintypes.DWORD()
+            advapi32.GetTokenInformation(token, TOKEN_USER_CLASS, None, 0, ctypes.byref(size))
+            buffer = ctypes.create_string_buffer(size.value)
+            if not advapi32.GetTokenInformation(token, TOKEN_USER_CLASS, buffer, size, ctypes.byref(size)):
+                raise ctypes.WinError(ctypes.get_last_error())
+            return sid_to_string(SID_AND_ATTRIBUTES.from_buffer(buffer).Sid)
+        finally:
+            kernel32.CloseHandle(token)
+
+    def private_security_descriptor(user_sid):
+        # Protected DACL: full control for SYSTEM, Administrators and us, read/list for Users
+        sddl = (f"O:{user_sid}D:P(A;OICI;FA;;;SY)(A;OICI;FA;;;BA)"
+                f"(A;OICI;FA;;;{user_sid})(A;OICI;GRGX;;;BU)")
+        descriptor = ctypes.c_void_p()
+        if not advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW(
+                sddl, SDDL_REVISION_1, ctypes.byref(descriptor), None):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return descriptor
+
+    def directory_owner(path):
+        owner = ctypes.c_void_p()
+        descriptor = ctypes.c_void_p()
+        error = advapi32.GetNamedSecurityInfoW(path, SE_FILE_OBJECT, OWNER_SECURITY_INFORMATION,
+                                               ctypes.byref(owner), None, None, None, ctypes.byref(descriptor))
+        if error:
+            raise ctypes.WinError(error)
+        try:
+            return sid_to_string(owner)
+        finally:
+            kernel32.LocalFree(descriptor)
+
+    def make_private_dir_windows(path):
+        user_sid = current_user_sid()
+        descriptor = private_security_descriptor(user_sid)
+        try:
+            attributes = SECURITY_ATTRIBUTES(ctypes.sizeof(SECURITY_ATTRIBUTES), descriptor, False)
+            if kernel32.CreateDirectoryW(path, ctypes.byref(attributes)):
+                return
+            error = ctypes.get_last_error()
+            if error != ERROR_ALREADY_EXISTS:
+                raise ctypes.WinError(error)
+
+            if os.lstat(path).st_file_attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT:
+                raise RuntimeError("is a junction or symlink")
+            owner = directory_owner(path)
+            if owner != user_sid and owner not in TRUSTED_OWNERS:
+                raise RuntimeError(f"owned by another account ({owner})")
+
+            # Ours, but possibly created with the inherited ProgramData ACL: reapply ours
+            present, defaulted = wintypes.BOOL(), wintypes.BOOL()
+            dacl = ctypes.c_void_p()
+            if not advapi32.GetSecurityDescriptorDacl(descriptor, ctypes.byref(present),
+                                                      ctypes.byref(dacl), ctypes.byref(defaulted)):
+                raise ctypes.WinError(ctypes.get_last_error())
+            error = advapi32.SetNamedSecurityInfoW(path, SE_FILE_OBJECT,
+                                                   DACL_SECURITY_INFORMATION | PROTECTED_DACL_SECURITY_INFORMATION,
+                                                   None, None, dacl, None)
+            if error:
+                raise ctypes.WinError(error)
+        finally:
+            kernel32.LocalFree(descriptor)
+
+def make_private_dir(path):
+    """Create `path`, or accept it if it exists and is ours; raise RuntimeError/OSError otherwise.
+
+    The shared default locations (/dev/shm, %ProgramData%) let any user create
+    entries, so an existing directory is only trusted if we own it.
+    """
+    if sys.platform == "win32":
+        make_private_dir_windows(path)
+        return
+
+    try:
+        os.mkdir(path, 0o755)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError("not a directory (or a symlink)")
+    if st.st_uid != os.getuid():
+        raise RuntimeError("owned by another user")
+    if stat.S_IMODE(st.st_mode) != 0o755:
+        os.chmod(path, 0o755)
@@ -1,12 +1,14 @@
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from src.core.config import config_manager
+from src.core.clock import system_clock
 
 class TimerService(QObject):
     work_finished = pyqtSignal() # Time to rest
     rest_finished = pyqtSignal() # Time to work
 
-    def __init__(self):
+    def __init__(self, clock=None):
         super().__init__()
+        self.clock = clock or system_clock
         self.work_timer = QTimer()
         self.work_timer.setSingleShot(True)
         self.work_timer.timeout.connect(self.on_work_finished)
@@ -20,7 +22,7 @@ class TimerService(QObject):
     def start_work(self):
         minutes = config_manager.get("work_interval_minutes", 45)
         print(f"Starting work timer for {minutes} minutes.")
-        self.work_timer.start(minutes * 60 * 1000) 
+        self.work_timer.start(self.clock.interval_ms(minutes * 60 * 1000))
 
     def on_work_finished(self):
         print("Work finished, triggering rest.")
@@ -1,21 +1,67 @@
 import sys
 import os
+from collections import OrderedDict
+from functools import partial
 from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QApplication
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QEvent
-from PyQt6.QtGui import QPixmap, QImage, QKeyEvent, QAction
-from PIL import Image, ImageFilter, ImageEnhance
+from PyQt6.QtCore import Qt, QTimer, QSize, pyqtSignal, QEvent
+from PyQt6.QtGui import QPixmap, QImage, QKeyEvent, QAction, QPainter
+from PyQt6 import sip
 
 # Ensure src is in path for imports if run directly
 if __name__ == "__main__":
     sys.path.append(os.path.join(os.path.dirname(__file__), '../../'))
 
 from src.core.config import config_manager
+from src.core.clock import system_clock
+from src.core.render import MappedRender, render_rgb
+
+# Rendered backgrounds shared by all overlays, keyed by
+# (image path, physical width, physical height, blur radius, device pixel ratio).
+# Screens with the same physical size and DPR reuse one pixmap or mapped render.
+RENDER_CACHE_SIZE = 8
+_render_cache = OrderedDict()
+
+def render_key(path, size, blur_radius, device_pixel_ratio):
+    return (path, size.width(), size.height(), blur_radius, device_pixel_ratio)
+
+def cached_background(key):
+    background = _render_cache.get(key)
+    if background is not None:
+        _render_cache.move_to_end(key)
+    return background
+
+def cache_background(key, background):
+    _render_cache[key] = background
+    while len(_render_cache) > RENDER_CACHE_SIZE:
+        _render_cache.popitem(last=False)
+
+def render_background(path, size, blur_radius, device_pixel_ratio):
+    """Render `path` in-process into a QPixmap at physical `size` tagged with `device_pixel_ratio` (None = placeholder)."""
+    key = render_key(path, size, blur_radius, device_pixel_ratio)
+    pixmap = cached_background(key)
+    if pixmap is not None:
+        return pixmap
+
+    data = render_rgb(path, size.width(), size.height(), blur_radius)
+    qim = QImage(data, size.width(), size.height(), size.width() * 3, QImage.Format.Format_RGB888)
+    pixmap = QPixmap.fromImage(qim)
+    # fromImage copied the pixels
+    del qim, data
+
+    # Tag the fresh pixmap once, tagging a shared one would detach a full copy per overlay
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    cache_background(key, pixmap)
+    return pixmap
+
+def clear_render_cache():
+    _render_cache.clear()
 
 class OverlayWindow(QWidget):
     finished = pyqtSignal()  # Signal when rest is over or exited
 
-    def __init__(self, screen_geometry=None):
+    def __init__(self, screen_geometry=None, device_pixel_ratio=None, time_left=None, clock=None):
         super().__init__()
+        self.clock = clock or system_clock
         self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
@@ -24,15 +70,20 @@ class OverlayWindow(QWidget):
             self.setGeometry(screen_geometry)
         else:
             self.showFullScreen()
-
+        self.device_pixel_ratio = device_pixel_ratio or self.devicePixelRatioF()
+        self.background = None
+        self.pending_render = None
+        self.render_size = None
+        self.render_dpr = None
 
         self.esc_start_time = 0
         self.esc_timer = QTimer()
-        self.esc_timer.setInterval(100) # Check every 100ms
+        self.esc_timer.setInterval(self.clock.interval_ms(100)) # Check every 100ms
         self.esc_timer.timeout.connect(self.check_esc_long_press)
         
         self.rest_duration = config_manager.get("rest_duration_seconds", 20)
-        self.time_left = self.rest_duration
+        # A screen plugged in mid-break joins the running countdown
+        self.time_left = time_left if time_left is not None else self.rest_duration
         
         self.init_ui()
         self.setup_timer()
@@ -93,78 +144,111 @@ class OverlayWindow(QWidget):
             interval = config_manager.get("cycle_interval_seconds", 5)
             self.cycle_timer = QTimer()
             self.cycle_timer.timeout.connect(self.next_background)
-            self.cycle_timer.start(interval * 1000)
+            self.cycle_timer.start(self.clock.interval_ms(interval * 1000))
 
     def next_background(self):
         self.current_image_index = (self.current_image_index + 1) % len(self.image_queue)
         self.update_background()
 
+    def physical_size(self):
+        return QSize(round(self.width() * self.device_pixel_ratio),
+                     round(self.height() * self.device_pixel_ratio))
+
+    def blur_radius(self):
+        # The configured radius is in logical pixels, renders are in physical pixels
+        return config_manager.get("blur_radius", 15) * self.device_pixel_ratio
+
+    def update_screen(self, screen_geometry, device_pixel_ratio):
+        """Follow a geometry/DPI change of our screen, re-rendering only if the physical size or DPR changed."""
+        self.device_pixel_ratio = device_pixel_ratio
+        self.setGeometry(screen_geometry)
+        if self.physical_size() != self.render_size or device_pixel_ratio != self.render_dpr:
+            if self.image_queue:
+                self.update_background()
+            else:
+                self.create_placeholder_bg()
+
     def update_background(self):
         if not self.image_queue:
             return
 
         path = self.image_queue[self.current_image_index]
+        if config_manager.get("render_service", False):
+            self.request_service_render(path)
+        else:
+            self.render_locally(path)
+
+    def render_locally(self, path):
         try:
-            img = Image.open(path)
-            # Resize logic to cover screen? 
-            # Pillow resize might be slow for large images on main thread, 
-            # but usually fine for a few mb.
-            # For better performance, we can just let Qt scale using aspect ratio.
-            # But we need to blur it.
-            
-            # Simple resize to screen size to save blur performance
-            img = img.resize((self.width(), self.height()))
-            
-            blur_radius = config_manager.get("blur_radius", 15)
-            if blur_radius > 0:
-                img = img.filter(ImageFilter.GaussianBlur(blur_radius))
-            
-            data = img.tobytes("raw", "RGB")
-            qim = QImage(data, img.size[0], img.size[1], QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(qim)
-            
-            if not hasattr(self, 'bg_label'):
-                self.bg_label = QLabel(self)
-                self.bg_label.setScaledContents(True)
-                self.bg_label.resize(self.width(), self.height())
-                self.bg_label.lower()
-
-            self.bg_label.setPixmap(pixmap)
-            
+            self.set_background(render_background(path, self.physical_size(), self.blur_radius(), self.device_pixel_ratio))
         except Exception as e:
             print(f"Error loading image {path}: {e}")
             self.create_placeholder_bg()
 
+    def request_service_render(self, path):
+        size = self.physical_size()
+        blur_radius = self.blur_radius()
+        key = render_key(path, size, blur_radius, self.device_pixel_ratio)
+        background = cached_background(key)
+        if background is not None:
+            self.set_background(background)
+            return
+
+        # Keep showing the current background or the placeholder until the service answers
+        if self.background is None:
+            self.create_placeholder_bg()
+        self.pending_render = key
+        # Imported here so desktops without the service never load QtNetwork
+        from src.core.render_service import render_client
+        render_client.request(path, size.width(), size.height(), blur_radius,
+                              partial(self.on_service_render, key, path))
+
+    def on_service_render(self, key, path, result):
+        # The overlay may have been closed or moved on to another image meanwhile
+        if sip.isdeleted(self) or key != self.pending_render:
+            return
+        self.pending_render = None
+        if result is None:
+            # No shared render service, render in-process
+            self.render_locally(path)
+            return
+        cache_background(key, result)
+        self.set_background(result)
+
     def create_placeholder_bg(self):
         # Fallback background
         try:
-            img = Image.new('RGB', (self.width(), self.height()), color = (73, 109, 137))
-            blur_radius = config_manager.get("blur_radius", 15)
-            if blur_radius > 0:
-                img = img.filter(ImageFilter.GaussianBlur(blur_radius))
-            data = img.tobytes("raw", "RGB")
-            qim = QImage(data, img.size[0], img.size[1], QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(qim)
-            
-            if not hasattr(self, 'bg_label'):
-                self.bg_label = QLabel(self)
-                self.bg_label.setScaledContents(True)
-                self.bg_label.resize(self.width(), self.height())
-                self.bg_label.lower()
-
-            self.bg_label.setPixmap(pixmap)
+            self.set_background(render_background(None, self.physical_size(), self.blur_radius(), self.device_pixel_ratio))
         except:
              self.setStyleSheet("background-color: rgba(50, 50, 50, 200);")
 
+    def set_background(self, background):
+        # Painted directly: a scaled QLabel would keep two more full-screen copies per overlay
+        self.background = background
+        self.render_size = background.size()
+        self.render_dpr = self.device_pixel_ratio
+        self.update()
+
+    def paintEvent(self, event):
+        if self.background is None:
+            return
+        painter = QPainter(self)
+        if isinstance(self.background, MappedRender):
+            # Paint from the shared mapping, a QPixmap would copy it into this session
+            painter.drawImage(self.rect(), self.background.image)
+        else:
+            painter.drawPixmap(self.rect(), self.background)
+        painter.end()
+
     def setup_timer(self):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_timer)
-        self.timer.start(1000)
+        self.timer.start(self.clock.interval_ms(1000))
         
         # Focus enforcement timer
         self.focus_timer = QTimer()
         self.focus_timer.timeout.connect(self.enforce_focus)
-        self.focus_timer.start(500) # Every 500ms
+        self.focus_timer.start(self.clock.interval_ms(500)) # Every 500ms
 
     def enforce_focus(self):
         self.raise_()
@@ -185,11 +269,21 @@ class OverlayWindow(QWidget):
         self.close()
         self.finished.emit()
 
+    def release_resources(self):
+        """Stop timers and drop the background pixmap so memory is freed right away."""
+        self.timer.stop()
+        self.focus_timer.stop()
+        self.esc_timer.stop()
+        if hasattr(self, 'cycle_timer'):
+            self.cycle_timer.stop()
+        self.background = None
+        self.pending_render = None
+        self.image_queue = []
+
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Escape:
             if not event.isAutoRepeat():
-                import time
-                self.esc_start_time = time.time()
+                self.esc_start_time = self.clock.time()
                 self.esc_timer.start()
                 print("ESC pressed")
         # Block other keys
@@ -203,8 +297,7 @@ class OverlayWindow(QWidget):
                 print("ESC released")
 
     def check_esc_long_press(self):
-        import time
-        elapsed = time.time() - self.esc_start_time
+        elapsed = self.clock.time() - self.esc_start_time
         if elapsed >= 5:
             print("Emergency exit triggered")
             self.finish_rest()
@@ -216,11 +309,6 @@ class OverlayWindow(QWidget):
     def mousePressEvent(self, event):
         pass
 
-    def resizeEvent(self, event):
-        if hasattr(self, 'bg_label'):
-            self.bg_label.resize(self.width(), self.height())
-        super().resizeEvent(event)
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = OverlayWindow()
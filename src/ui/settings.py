@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QButtonGroup, QTabWidget, QWidget, QListWidgetItem,
                              QMessageBox)
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QPixmap
+from PyQt6.QtGui import QIcon, QPixmap, QImageReader
 from src.core.config import config_manager
 import os
 
@@ -210,12 +210,15 @@ class SettingsDialog(QDialog):
         item.setData(Qt.ItemDataRole.UserRole, path)
         
         # Create thumbnail
-        pixmap = QPixmap(path)
-        if not pixmap.isNull():
-            # Scale to icon size, keeping aspect ratio, making it cover the square slightly or fit
-            # We want a nice thumbnail.
-            scaled = pixmap.scaled(160, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            item.setIcon(QIcon(scaled))
+        # Decode straight at icon size instead of loading the full wallpaper first
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(160, 100, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if not image.isNull():
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
         else:
             # Placeholder or broken image icon
             pass 
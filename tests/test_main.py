@@ -0,0 +1,59 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from src.core.config import config_manager
+
+app = QApplication.instance() or QApplication([])
+
+from main import EyeProtectionApp
+
+class ScreenChangeTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_config = config_manager.config
+        config_manager.config = dict(self.saved_config, wallpapers=[], render_service=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.eye = EyeProtectionApp(show_settings_on_launch=False)
+            self.eye.show_overlay()
+        self.screen = QApplication.primaryScreen()
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.eye.timer_service.stop()
+            self.eye.close_overlays()
+        config_manager.config = self.saved_config
+
+    def test_losing_the_only_screen_pauses_the_break(self):
+        self.eye.overlays[self.screen].time_left = 7
+
+        with mock.patch.object(self.eye.timer_service, "on_rest_finished") as rest_finished:
+            self.eye.on_screen_removed(self.screen)
+
+        rest_finished.assert_not_called()
+        self.assertEqual(self.eye.overlays, {})
+        self.assertTrue(self.eye.in_break())
+        self.assertTrue(self.eye.suspend_timer.isActive())
+
+        self.eye.on_screen_added(self.screen)
+
+        self.assertEqual(self.eye.overlays[self.screen].time_left, 7)
+        self.assertFalse(self.eye.suspend_timer.isActive())
+
+    def test_break_ends_if_no_screen_comes_back(self):
+        self.eye.on_screen_removed(self.screen)
+
+        with mock.patch.object(self.eye.timer_service, "on_rest_finished") as rest_finished, \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.eye.suspend_timer.timeout.emit()
+
+        rest_finished.assert_called_once()
+        self.assertFalse(self.eye.in_break())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtWidgets import QApplication
+
+from src.core.config import config_manager
+from src.ui import overlay
+
+app = QApplication.instance() or QApplication([])
+
+GEOMETRY = QRect(0, 0, 320, 200)
+
+class OverlayRenderTest(unittest.TestCase):
+    def setUp(self):
+        # In-memory overrides only, save_config() would write config.json
+        self.saved_config = config_manager.config
+        config_manager.config = dict(self.saved_config, wallpapers=[], render_service=False, blur_radius=4)
+        overlay.clear_render_cache()
+        patcher = mock.patch.object(overlay, "render_rgb", wraps=overlay.render_rgb)
+        self.render_rgb = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.overlays = []
+
+    def tearDown(self):
+        for window in self.overlays:
+            window.release_resources()
+            window.deleteLater()
+        overlay.clear_render_cache()
+        config_manager.config = self.saved_config
+
+    def make_overlay(self, device_pixel_ratio):
+        window = overlay.OverlayWindow(GEOMETRY, device_pixel_ratio)
+        self.overlays.append(window)
+        return window
+
+    def test_same_physical_size_and_dpr_share_one_pixmap(self):
+        first = self.make_overlay(2.0)
+        second = self.make_overlay(2.0)
+
+        self.assertIs(first.background, second.background)
+        self.assertEqual(self.render_rgb.call_count, 1)
+        self.assertEqual(first.background.size().width(), 640)
+        self.assertEqual(first.background.devicePixelRatio(), 2.0)
+        # Blur is configured in logical pixels
+        self.assertEqual(self.render_rgb.call_args.args[3], 8.0)
+
+    def test_unchanged_screen_does_not_rerender(self):
+        window = self.make_overlay(1.5)
+        background = window.background
+
+        window.update_screen(GEOMETRY, 1.5)
+
+        self.assertIs(window.background, background)
+        self.assertEqual(self.render_rgb.call_count, 1)
+
+    def test_dpr_change_rerenders(self):
+        window = self.make_overlay(1.0)
+
+        window.update_screen(GEOMETRY, 2.0)
+
+        self.assertEqual(self.render_rgb.call_count, 2)
+        self.assertEqual(window.background.devicePixelRatio(), 2.0)
+        self.assertEqual(window.background.size().width(), 640)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import gc
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6 import sip
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtNetwork import QLocalSocket
+from PyQt6.QtWidgets import QApplication
+from PIL import Image
+
+from src.core.config import config_manager
+from src.core.render import MappedRender, render_rgb
+from src.core.render_service import MAX_RENDER_SIDE, RenderClient, RenderServer
+
+app = QApplication.instance() or QApplication([])
+
+def wait_for(condition, timeout_ms=5000):
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: condition() and loop.quit())
+    poll.start(10)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    poll.stop()
+    return condition()
+
+class RenderServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.roots = os.path.join(self.tmp, "wallpapers")
+        os.mkdir(self.roots)
+        self.wallpaper = os.path.join(self.roots, "wall.png")
+        Image.new("RGB", (64, 48), color=(200, 40, 10)).save(self.wallpaper)
+
+        # In-memory overrides only, save_config() would write config.json
+        self.saved_config = config_manager.config
+        config_manager.config = dict(self.saved_config,
+                                     render_service_roots=[self.roots],
+                                     render_service_dir=os.path.join(self.tmp, "cache"))
+
+        self.server_name = f"EyeProtectorRenderTest-{uuid.uuid4().hex}"
+        self.server = RenderServer(self.server_name)
+        self.assertTrue(self.server.listen())
+        self.client = RenderClient(self.server_name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        config_manager.config = self.saved_config
+        shutil.rmtree(self.tmp)
+
+    def fetch(self, path, width=32, height=24, blur_radius=2.0):
+        results = []
+        self.client.request(path, width, height, blur_radius, results.append)
+        self.assertTrue(wait_for(lambda: results), "no reply from render service")
+        return results[0]
+
+    def test_renders_once_and_maps_without_copy(self):
+        first = self.fetch(self.wallpaper)
+        second = self.fetch(self.wallpaper)
+
+        self.assertIsInstance(first, MappedRender)
+        self.assertEqual(len(self.server.entries), 1)
+        expected = render_rgb(self.wallpaper, 32, 24, 2.0)
+        self.assertEqual(first.image.constBits().asstring(len(expected)), expected)
+        # The QImage points into the mapping itself
+        self.assertEqual(int(first.image.constBits()), int(sip.voidptr(first.pixels)))
+        self.assertEqual(first.image.constBits().asstring(len(expected)),
+                         second.image.constBits().asstring(len(expected)))
+
+    def test_concurrent_requests_share_one_render(self):
+        results = []
+        other = RenderClient(self.server_name)
+        self.client.request(self.wallpaper, 32, 24, 2.0, results.append)
+        other.request(self.wallpaper, 32, 24, 2.0, results.append)
+        self.assertTrue(wait_for(lambda: len(results) == 2))
+        self.assertTrue(all(isinstance(r, MappedRender) for r in results))
+        self.assertEqual(len(self.server.entries), 1)
+
+    def test_connections_survive_garbage_collection(self):
+        collector = QTimer()
+        collector.timeout.connect(gc.collect)
+        collector.start(0)
+        try:
+            self.assertIsInstance(self.fetch(self.wallpaper), MappedRender)
+        finally:
+            collector.stop()
+
+    def test_refuses_path_outside_roots(self):
+        outside = os.path.join(self.tmp, "secret.png")
+        Image.new("RGB", (8, 8)).save(outside)
+        self.assertIsNone(self.fetch(outside))
+        self.assertEqual(self.server.entries, {})
+
+    def test_survives_garbage_and_oversized_requests(self):
+        socket = QLocalSocket()
+        socket.connectToServer(self.server_name)
+        self.assertTrue(socket.waitForConnected(1000))
+        socket.write(b"\xff\xfe not utf-8\n")
+        self.assertTrue(wait_for(socket.canReadLine))
+        self.assertIn(b"error", bytes(socket.readLine()))
+
+        socket.write(b"x" * 10000)
+        self.assertTrue(wait_for(lambda: socket.state() == QLocalSocket.LocalSocketState.UnconnectedState))
+
+        self.assertIsInstance(self.fetch(self.wallpaper), MappedRender)
+
+    def test_cache_is_bounded_in_bytes(self):
+        one_render = 32 * 24 * 3
+        self.server.max_bytes = 2 * one_render
+        for blur_radius in (1.0, 2.0, 3.0):
+            self.assertIsInstance(self.fetch(self.wallpaper, blur_radius=blur_radius), MappedRender)
+
+        self.assertEqual(len(self.server.entries), 2)
+        self.assertEqual(self.server.cache_bytes, 2 * one_render)
+        self.assertEqual(len(os.listdir(self.server.cache_dir)), 2)
+
+    def test_refuses_oversized_and_too_many_renders(self):
+        self.assertIsNone(self.fetch(self.wallpaper, width=MAX_RENDER_SIDE + 1))
+
+        self.server.max_pending = 1
+        # Occupy the only slot with a render that never finishes
+        self.server.pending["stuck"] = []
+        self.assertIsNone(self.fetch(self.wallpaper))
+        self.assertEqual(self.server.entries, {})
+
+    def test_missing_service_falls_back(self):
+        client = RenderClient(f"EyeProtectorRenderMissing-{uuid.uuid4().hex}")
+        results = []
+        client.request(self.wallpaper, 32, 24, 2.0, results.append)
+        self.assertTrue(wait_for(lambda: results, 1000))
+        self.assertIsNone(results[0])
+
+    @unittest.skipUnless(os.name == "posix", "symlink and ownership checks are POSIX only")
+    def test_refuses_symlinked_cache_dir(self):
+        target = os.path.join(self.tmp, "elsewhere")
+        os.mkdir(target)
+        link = os.path.join(self.tmp, "link")
+        os.symlink(target, link)
+        config_manager.config["render_service_dir"] = link
+        server = RenderServer(f"EyeProtectorRenderLink-{uuid.uuid4().hex}")
+        try:
+            self.assertFalse(server.listen())
+        finally:
+            server.shutdown()
+
+    @unittest.skipUnless(os.name == "posix" and os.getuid() == 0, "needs root to hand the directory to another user")
+    def test_refuses_cache_dir_owned_by_someone_else(self):
+        planted = os.path.join(self.tmp, "planted")
+        os.mkdir(planted, 0o777)
+        os.chown(planted, 12345, 12345)
+        config_manager.config["render_service_dir"] = planted
+        server = RenderServer(f"EyeProtectorRenderPlanted-{uuid.uuid4().hex}")
+        try:
+            self.assertFalse(server.listen())
+        finally:
+            server.shutdown()
+
+class ImportCostTest(unittest.TestCase):
+    def test_overlay_does_not_load_qtnetwork(self):
+        code = "import sys, src.ui.overlay; print('PyQt6.QtNetwork' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual(output.strip(), "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+import soak
+
+class SoakTest(unittest.TestCase):
+    def run_soak(self, *extra):
+        report = io.StringIO()
+        with contextlib.redirect_stdout(report):
+            result = soak.main(["--cycles", "60", "--warmup", "5", "--window", "10", "--report-every", "1000", *extra])
+        self.assertEqual(result, 0, report.getvalue())
+
+    def test_short_soak_shows_no_growth(self):
+        self.run_soak()
+
+    def test_short_soak_through_render_service(self):
+        self.run_soak("--render-service")
+
+if __name__ == "__main__":
+    unittest.main()